@@ -0,0 +1,118 @@
+"""Checkpoint module."""
+
+import json
+import os
+from typing import List, Optional, Tuple
+
+
+class Checkpoint(object):
+    """Durable progress of an ETL run.
+
+    Keeps the planned rowid ranges with the last committed rowid in each
+    of them and the counts so far. Without a path the progress is only
+    kept in memory.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        """Construct object.
+
+        Args:
+            path: Path to the checkpoint file
+        """
+        self.path = path
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget progress of previous runs."""
+        self.ranges = []
+        self.loaded = 0
+        self.batches = 0
+        self.last_id = None
+        self.finished = False
+
+    def restore(self) -> bool:
+        """Read progress from the checkpoint file.
+
+        Returns:
+            bool, whether there was a checkpoint to restore
+        """
+        if not self.path or not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r') as fcm:
+            state = json.load(fcm)
+        self.ranges = [list(rowid_range) for rowid_range in state['ranges']]
+        self.loaded = state['loaded']
+        self.batches = state['batches']
+        self.last_id = state['last_id']
+        self.finished = state['finished']
+        return True
+
+    def save(self) -> None:
+        """Write progress atomically to the checkpoint file."""
+        if not self.path:
+            return
+        state = {
+            'ranges': self.ranges,
+            'loaded': self.loaded,
+            'batches': self.batches,
+            'last_id': self.last_id,
+            'finished': self.finished,
+        }
+        tmp_path = '{0}.tmp'.format(self.path)
+        with open(tmp_path, 'w') as fcm:
+            json.dump(state, fcm)
+            fcm.flush()
+            os.fsync(fcm.fileno())
+        os.replace(tmp_path, self.path)
+
+    def plan(self, ranges: List[Tuple[int, int]]) -> None:
+        """Record rowid ranges of the run.
+
+        Args:
+            ranges: Inclusive rowid ranges
+        """
+        self.ranges = [[start, end, None] for start, end in ranges]
+        self.save()
+
+    def pending(self) -> List[Tuple[int, int]]:
+        """Return rowid ranges which are not committed yet.
+
+        Returns:
+            List[Tuple[int, int]]
+        """
+        pending = []
+        for start, end, committed in self.ranges:
+            if committed is not None:
+                start = committed + 1
+            if start <= end:
+                pending.append((start, end))
+        return pending
+
+    def commit(
+        self,
+        *,
+        range_end: int,
+        last_rowid: int,
+        last_id: str,
+        count: int,
+    ) -> None:
+        """Record an acknowledged batch.
+
+        Args:
+            range_end: End of the rowid range the batch belongs to
+            last_rowid: Last rowid in the batch
+            last_id: Last movie ID in the batch
+            count: Number of movies in the batch
+        """
+        for rowid_range in self.ranges:
+            if rowid_range[1] == range_end:
+                rowid_range[2] = last_rowid
+        self.loaded += count
+        self.batches += 1
+        self.last_id = last_id
+        self.save()
+
+    def finish(self) -> None:
+        """Mark the run as completed."""
+        self.finished = True
+        self.save()
@@ -0,0 +1,6 @@
+"""ETL modules import each other as top-level modules."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
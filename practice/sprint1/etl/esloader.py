@@ -1,5 +1,6 @@
 """Elasticsearch module."""
 
+import gzip
 import json
 import logging
 import os
@@ -8,12 +9,38 @@ from urllib.parse import urljoin
 
 import requests
 
+logger = logging.getLogger(__name__)
+
+
+class BulkError(Exception):
+    """Some items of a bulk request were not indexed."""
+
+    def __init__(self, failed: List[dict]):
+        """Construct object.
+
+        Args:
+            failed: Bulk response items which were not indexed
+        """
+        super().__init__(
+            '{0} bulk items failed, first error: {1}'.format(
+                len(failed), failed[0].get('error'),
+            ),
+        )
+        self.failed = failed
+
 
 class ESLoader(object):
     """Loading to Elasticsearch."""
 
-    def __init__(self, url: str):
+    def __init__(self, url: str, *, compression_level: int = 6):
+        """Construct object.
+
+        Args:
+            url: Elasticsearch URL
+            compression_level: Gzip level of bulk bodies, 0 disables it
+        """
         self.url = url
+        self.compression_level = compression_level
 
     def create_index(self, *, index_name: str, mapping_file: str) -> None:
         """Create an index in Elasticsearch.
@@ -64,6 +91,10 @@ class ESLoader(object):
                 ]
         Если значения нет или оно N/A, то нужно менять на None
         В списках значение N/A надо пропускать
+
+        Raises:
+            HTTPError: Bulk request was not acknowledged
+            BulkError: Some records were not indexed
         """
         json_object_list = []
         for record in records:
@@ -74,11 +105,36 @@ class ESLoader(object):
                 }
             }
             json_object_list.extend([json.dumps(index), json.dumps(record)])
-        nbjson = '\n'.join(json_object_list) + '\n'
+        nbjson = ('\n'.join(json_object_list) + '\n').encode()
 
         headers = {'Content-Type': 'application/x-ndjson'}
+        if self.compression_level:
+            nbjson = gzip.compress(nbjson, compresslevel=self.compression_level)
+            headers['Content-Encoding'] = 'gzip'
         request = requests.post(
             urljoin(self.url, '_bulk'),
             headers=headers,
             data=nbjson,
         )
+        request.raise_for_status()
+        self._raise_on_failed_items(request.json())
+
+    def _raise_on_failed_items(self, response: dict) -> None:
+        """Check that every item of a bulk response was indexed.
+
+        Args:
+            response: Parsed bulk response
+
+        Raises:
+            BulkError: Some records were not indexed
+        """
+        failed = []
+        for item in response.get('items', []):
+            result = item['index']
+            if result.get('error') or result.get('status', 200) >= 300:
+                logger.error(result.get('error'))
+                failed.append(result)
+        if response.get('errors') and not failed:
+            failed.append({'error': 'bulk response reported errors'})
+        if failed:
+            raise BulkError(failed)
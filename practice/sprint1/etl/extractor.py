@@ -2,8 +2,13 @@
 
 import json
 import sqlite3
-from typing import Any, Dict, List
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.request import pathname2url
 
+from checkpoint import Checkpoint
 from esloader import ESLoader
 
 NONE_PATTERNS = ('N/A', '')
@@ -16,9 +21,16 @@ MOVIES_QUERY = """SELECT
             m.plot as description,
             m.director,
             m.writer,
-            m.writers
+            m.writers,
+            m.rowid
         FROM movies m"""
 
+MOVIES_RANGE_QUERY = MOVIES_QUERY + """
+        WHERE m.rowid BETWEEN ? AND ?
+        ORDER BY m.rowid"""
+
+ROWID_BOUNDS_QUERY = 'SELECT min(rowid), max(rowid) FROM movies'
+
 ACTORS_QUERY = """SELECT
         a.id,
         a.name
@@ -36,15 +48,32 @@ WRITERS_QUERY = """SELECT DISTINCT
 class ETL(object):
     """Extraction and transformation."""
 
-    def __init__(self, conn: sqlite3.Connection, es_loader: ESLoader):
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        es_loader: ESLoader,
+        *,
+        workers: int = 1,
+        batch_size: int = 500,
+        partition_size: int = 5000,
+        checkpoint: Optional[Checkpoint] = None,
+    ):
         """Construct object.
 
         Args:
             conn: Database connection
             es_loader: Elasticsearch instance
+            workers: Number of concurrent partition readers
+            batch_size: Number of movies in one bulk request
+            partition_size: Number of rowids in one extracted range
+            checkpoint: Progress to resume from and record to
         """
         self.es_loader = es_loader
         self.conn = conn
+        self.workers = workers
+        self.batch_size = batch_size
+        self.partition_size = partition_size
+        self.checkpoint = checkpoint or Checkpoint()
 
     def _transform_value(self, *, raw_value: Any) -> Any:
         """Transform value after extraction.
@@ -172,19 +201,165 @@ class ETL(object):
             'description': self._transform_value(raw_value=row[4]),
         }
 
-    def _extract_movies(self) -> List[Dict]:
+    def _extract_rows(
+        self,
+        *,
+        rowid_range: Tuple[int, int],
+    ) -> Iterator[Tuple[int, Dict]]:
         """Extract dataset.
 
-        Extract and return transformed dataset
+        Extract and yield transformed movies in rowid order
 
-        Returns:
-            List(Dict)
+        Args:
+            rowid_range: Inclusive range of movie rowids
+
+        Yields:
+            Tuple of rowid and transformed movie
         """
         movie_cursor = self.conn.cursor()
-        movies = []
-        for row in movie_cursor.execute(MOVIES_QUERY):
-            movies.append(self._transform_data(row=row))
-        return movies
+        for row in movie_cursor.execute(MOVIES_RANGE_QUERY, rowid_range):
+            yield row[8], self._transform_data(row=row)
+
+    def _get_db_file(self) -> str:
+        """Return path to the main database file.
+
+        Returns:
+            str, empty for in-memory databases
+        """
+        return self.conn.execute('PRAGMA database_list').fetchone()[2]
+
+    def _get_partitions(self) -> List[Tuple[int, int]]:
+        """Split movies table into rowid ranges of partition_size.
+
+        Returns:
+            List[Tuple[int, int]]
+        """
+        low, high = self.conn.execute(ROWID_BOUNDS_QUERY).fetchone()
+        if low is None:
+            return []
+        step = max(1, self.partition_size)
+        return [
+            (start, min(start + step - 1, high))
+            for start in range(low, high + 1, step)
+        ]
+
+    def _batches(
+        self,
+        rows: Iterable[Tuple[int, Dict]],
+    ) -> Iterator[List[Tuple[int, Dict]]]:
+        """Split rows into batches of batch_size.
+
+        Args:
+            rows: Pairs of rowid and movie
+
+        Yields:
+            List[Tuple[int, Dict]]
+        """
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _load_range(
+        self,
+        rows: Iterable[Tuple[int, Dict]],
+        *,
+        index_name: str,
+        rowid_range: Tuple[int, int],
+    ) -> int:
+        """Load rows in batches and checkpoint each acknowledged batch.
+
+        Args:
+            rows: Pairs of rowid and movie in rowid order
+            index_name: Index name
+            rowid_range: Rowid range the rows belong to
+
+        Returns:
+            int, number of loaded movies
+        """
+        loaded = 0
+        for batch in self._batches(rows):
+            last_rowid, last_movie = batch[-1]
+            self.es_loader.load_to_es(
+                [movie for _, movie in batch],
+                index_name,
+            )
+            self.checkpoint.commit(
+                range_end=rowid_range[1],
+                last_rowid=last_rowid,
+                last_id=last_movie['id'],
+                count=len(batch),
+            )
+            loaded += len(batch)
+        return loaded
+
+    def _load_partitioned(
+        self,
+        *,
+        index_name: str,
+        db_file: str,
+        ranges: List[Tuple[int, int]],
+    ) -> int:
+        """Extract rowid ranges concurrently and load them as they finish.
+
+        Args:
+            index_name: Index name
+            db_file: Path to the database file
+            ranges: Rowid ranges to extract
+
+        Returns:
+            int, number of loaded movies
+        """
+        total = 0
+        pending = iter(ranges)
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            # Keep a bounded number of ranges in flight so that results
+            # don't pile up in memory while they are being loaded
+            running = {
+                pool.submit(extract_partition, db_file, rowid_range)
+                for rowid_range in islice(pending, self.workers * 2)
+            }
+            number = 0
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rowid_range, rows, elapsed = future.result()
+                    for next_range in islice(pending, 1):
+                        running.add(
+                            pool.submit(extract_partition, db_file, next_range),
+                        )
+                    loaded = self._load_range(
+                        rows,
+                        index_name=index_name,
+                        rowid_range=rowid_range,
+                    )
+                    total += loaded
+                    number += 1
+                    print(
+                        'Partition {0}/{1} rowid {2}-{3}: '.format(
+                            number, len(ranges), *rowid_range,
+                        ) + '{0} movies in {1:.2f}s'.format(loaded, elapsed),
+                    )
+        return total
+
+    def _plan(self) -> List[Tuple[int, int]]:
+        """Return rowid ranges left to load.
+
+        Ranges of a restored checkpoint are kept as they were planned,
+        so a run may be resumed with another number of workers.
+
+        Returns:
+            List[Tuple[int, int]]
+        """
+        if self.checkpoint.finished:
+            self.checkpoint.reset()
+        if not self.checkpoint.ranges:
+            self.checkpoint.plan(self._get_partitions())
+        return self.checkpoint.pending()
 
     def load(self, index_name: str) -> None:
         """Extract and trasnform data.
@@ -195,5 +370,58 @@ class ETL(object):
         Args:
             index_name: название индекса, в который будут грузиться данные
         """
-        movies = self._extract_movies()
-        self.es_loader.load_to_es(movies, index_name)
+        started = time.monotonic()
+        db_file = self._get_db_file()
+        partitioned = self.workers > 1 and bool(db_file)
+        ranges = self._plan()
+        if partitioned:
+            total = self._load_partitioned(
+                index_name=index_name,
+                db_file=db_file,
+                ranges=ranges,
+            )
+        else:
+            total = 0
+            for rowid_range in ranges:
+                total += self._load_range(
+                    self._extract_rows(rowid_range=rowid_range),
+                    index_name=index_name,
+                    rowid_range=rowid_range,
+                )
+        self.checkpoint.finish()
+        elapsed = time.monotonic() - started
+        print(
+            'Loaded {0} movies in {1} ranges with {2} workers '.format(
+                total, len(ranges), self.workers,
+            ) + 'in {0:.2f}s ({1:.0f} movies/s), {2} in total'.format(
+                elapsed, total / elapsed if elapsed else 0,
+                self.checkpoint.loaded,
+            ),
+        )
+
+
+def extract_partition(
+    db_file: str,
+    rowid_range: Tuple[int, int],
+) -> Tuple[Tuple[int, int], List[Tuple[int, Dict]], float]:
+    """Extract and transform one rowid range on its own connection.
+
+    Runs in a worker process, so the connection is opened read-only here.
+
+    Args:
+        db_file: Path to the database file
+        rowid_range: Inclusive range of movie rowids
+
+    Returns:
+        Tuple of the range, rowid and movie pairs and elapsed seconds
+    """
+    started = time.monotonic()
+    conn = sqlite3.connect(
+        'file:{0}?mode=ro'.format(pathname2url(db_file)),
+        uri=True,
+    )
+    try:
+        rows = list(ETL(conn, None)._extract_rows(rowid_range=rowid_range))
+    finally:
+        conn.close()
+    return rowid_range, rows, time.monotonic() - started
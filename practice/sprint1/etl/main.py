@@ -1,8 +1,10 @@
 """Main module."""
 
+import argparse
 import os
 import sqlite3
 
+from checkpoint import Checkpoint
 from esloader import ESLoader
 from extractor import ETL
 
@@ -10,19 +12,52 @@ DB_FILE_NAME = 'db.sqlite'
 INDEX_NAME = 'movies'
 ELASTIC_HOST = 'http://0.0.0.0:9200'
 MAPPING_FILE = 'mapping.json'
+BULK_COMPRESSION_LEVEL = 6
+BATCH_SIZE = 500
+PARTITION_SIZE = 5000
+CHECKPOINT_FILE = 'checkpoint.json'
 
 
 def main():
     """Run main flow."""
+    parser = argparse.ArgumentParser(description='Load movies to Elasticsearch')
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue from the last checkpoint',
+    )
+    args = parser.parse_args()
+
     dirname = os.path.dirname(__file__)
+    checkpoint = Checkpoint(os.path.join(dirname, CHECKPOINT_FILE))
+    if args.resume and checkpoint.restore():
+        if checkpoint.finished:
+            print('Nothing to resume, the last run has finished')
+            return
+        print('Resuming after {0}: {1} movies in {2} batches'.format(
+            checkpoint.last_id, checkpoint.loaded, checkpoint.batches,
+        ))
+    else:
+        checkpoint.save()
+
     db = os.path.join(dirname, DB_FILE_NAME)
     connection = sqlite3.connect(db)
 
     mapping_file = os.path.join(dirname, MAPPING_FILE)
-    es_loader = ESLoader(ELASTIC_HOST)
+    es_loader = ESLoader(
+        ELASTIC_HOST,
+        compression_level=BULK_COMPRESSION_LEVEL,
+    )
     es_loader.create_index(index_name=INDEX_NAME, mapping_file=mapping_file)
 
-    etl = ETL(connection, es_loader)
+    etl = ETL(
+        connection,
+        es_loader,
+        workers=os.cpu_count() or 1,
+        batch_size=BATCH_SIZE,
+        partition_size=PARTITION_SIZE,
+        checkpoint=checkpoint,
+    )
     etl.load(INDEX_NAME)
 
 
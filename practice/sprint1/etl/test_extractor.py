@@ -0,0 +1,75 @@
+"""Tests of checkpointed loading."""
+
+import os
+import sqlite3
+
+import pytest
+
+from checkpoint import Checkpoint
+from esloader import BulkError, ESLoader
+from extractor import ETL
+
+DB_FILE = os.path.join(os.path.dirname(__file__), 'db.sqlite')
+
+
+class FlakyLoader(object):
+    """Loader rejecting the batch with the given number."""
+
+    def __init__(self, fail_on: int = 0):
+        self.fail_on = fail_on
+        self.calls = 0
+        self.loaded = []
+
+    def load_to_es(self, records, index_name):
+        self.calls += 1
+        if self.calls == self.fail_on:
+            raise BulkError([{'status': 429, 'error': 'rejected'}])
+        self.loaded.extend(record['id'] for record in records)
+
+
+@pytest.fixture
+def conn():
+    connection = sqlite3.connect(DB_FILE)
+    yield connection
+    connection.close()
+
+
+def test_rejected_batch_is_resent_on_resume(conn, tmp_path):
+    path = str(tmp_path / 'checkpoint.json')
+    first = FlakyLoader(fail_on=3)
+    with pytest.raises(BulkError):
+        ETL(
+            conn, first, batch_size=100, checkpoint=Checkpoint(path),
+        ).load('movies')
+
+    checkpoint = Checkpoint(path)
+    assert checkpoint.restore()
+    assert checkpoint.loaded == len(first.loaded) == 200
+    assert not checkpoint.finished
+
+    second = FlakyLoader()
+    ETL(conn, second, batch_size=100, checkpoint=checkpoint).load('movies')
+
+    movie_ids = {row[0] for row in conn.execute('SELECT id FROM movies')}
+    assert set(first.loaded) | set(second.loaded) == movie_ids
+    assert not set(first.loaded) & set(second.loaded)
+    assert checkpoint.finished
+    assert checkpoint.loaded == len(movie_ids)
+
+
+@pytest.mark.parametrize('response', [
+    {'errors': True, 'items': [
+        {'index': {'status': 201}},
+        {'index': {'status': 429, 'error': {'type': 'rejected'}}},
+    ]},
+    {'errors': True, 'items': []},
+])
+def test_bulk_response_with_failed_items_raises(response):
+    with pytest.raises(BulkError):
+        ESLoader('http://es/')._raise_on_failed_items(response)
+
+
+def test_bulk_response_without_errors_passes():
+    ESLoader('http://es/')._raise_on_failed_items(
+        {'errors': False, 'items': [{'index': {'status': 201}}]},
+    )
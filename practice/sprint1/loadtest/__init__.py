@@ -0,0 +1,4 @@
+"""Спринт 1. Нагрузочное тестирование.
+
+Нагрузочный прогон API фильмов на локальной заглушке Elasticsearch.
+"""
@@ -0,0 +1,277 @@
+"""In-process Elasticsearch stand-in.
+
+Serves the subset of the search API used by the web adapter
+from an in-memory catalog.
+"""
+
+import json
+import random
+import re
+import sqlite3
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+
+GENRES = (
+    'Action', 'Adventure', 'Comedy', 'Drama', 'Fantasy',
+    'Horror', 'Mystery', 'Sci-Fi', 'Thriller', 'Western',
+)
+WORDS = (
+    'star', 'wars', 'empire', 'return', 'galaxy', 'force', 'night',
+    'shadow', 'rising', 'last', 'hope', 'clone', 'rebel', 'dark',
+    'light', 'journey', 'planet', 'storm', 'legend', 'quest',
+)
+TOKEN_RE = re.compile(r'\w+')
+
+
+class CollectingLoader(object):
+    """ESLoader replacement that keeps records in memory."""
+
+    def __init__(self):
+        self.records = []
+
+    def load_to_es(self, records: List[dict], index_name: str) -> None:
+        """Keep records instead of sending them.
+
+        Args:
+            records: Transformed movies
+            index_name: Index name, ignored
+        """
+        self.records.extend(records)
+
+
+def load_sqlite_catalog(*, etl_dir: str, db_file: str) -> List[Dict]:
+    """Build catalog from SQLite database with the ETL transformation.
+
+    Args:
+        etl_dir: Directory of the ETL modules
+        db_file: Path to SQLite database
+
+    Returns:
+        List[Dict]
+    """
+    sys.path.insert(0, etl_dir)
+    from extractor import ETL  # noqa: WPS433
+
+    loader = CollectingLoader()
+    connection = sqlite3.connect(db_file)
+    try:
+        ETL(connection, loader).load('movies')
+    finally:
+        connection.close()
+    return loader.records
+
+
+def _make_people(rnd: random.Random, prefix: str) -> List[Dict]:
+    return [
+        {'id': str(rnd.randint(1, 5000)), 'name': '{0} {1}'.format(
+            prefix, rnd.choice(WORDS).title(),
+        )}
+        for _ in range(rnd.randint(1, 4))
+    ]
+
+
+def make_synthetic_catalog(*, size: int, seed: int = 0) -> List[Dict]:
+    """Generate synthetic catalog.
+
+    Args:
+        size: Number of movies
+        seed: Random seed
+
+    Returns:
+        List[Dict]
+    """
+    rnd = random.Random(seed)
+    movies = []
+    for number in range(size):
+        actors = _make_people(rnd, 'Actor')
+        writers = _make_people(rnd, 'Writer')
+        movies.append({
+            'id': 'tt{0:07d}'.format(number),
+            'genre': rnd.sample(GENRES, rnd.randint(1, 3)),
+            'writers': writers,
+            'actors': actors,
+            'writers_names': [writer['name'] for writer in writers],
+            'actors_names': [actor['name'] for actor in actors],
+            'imdb_rating': round(rnd.uniform(1, 10), 1),
+            'title': ' '.join(rnd.sample(WORDS, rnd.randint(1, 4))).title(),
+            'director': ['Director {0}'.format(rnd.choice(WORDS).title())],
+            'description': ' '.join(rnd.choices(WORDS, k=30)),
+        })
+    return movies
+
+
+def _field_text(value: Any) -> str:
+    if isinstance(value, list):
+        return ' '.join(str(element) for element in value)
+    if value is None:
+        return ''
+    return str(value)
+
+
+def _score(movie: Dict, *, tokens: List[str], fields: List[str]) -> float:
+    score = 0.0
+    for field in fields:
+        name, _, boost = field.partition('^')
+        text = set(TOKEN_RE.findall(_field_text(movie.get(name)).lower()))
+        matched = sum(1 for token in tokens if token in text)
+        score += matched * float(boost or 1)
+    return score
+
+
+class Catalog(object):
+    """Searchable in-memory movies index."""
+
+    def __init__(self, movies: List[Dict]):
+        self.movies = movies
+        self.by_id = {movie['id']: movie for movie in movies}
+
+    def stats(self) -> Dict:
+        """Return index stats in the shape of the _stats API.
+
+        Returns:
+            Dict
+        """
+        return {
+            'indices': {
+                'movies': {
+                    'uuid': 'loadtest',
+                    'primaries': {
+                        'docs': {'count': len(self.movies), 'deleted': 0},
+                        'indexing': {
+                            'index_total': len(self.movies),
+                            'delete_total': 0,
+                        },
+                    },
+                },
+            },
+        }
+
+    def _match(self, query: Dict) -> List[Tuple[float, Dict]]:
+        if 'match' in query:
+            movie = self.by_id.get(query['match'].get('id'))
+            return [(1.0, movie)] if movie else []
+        if 'multi_match' in query:
+            multi_match = query['multi_match']
+            tokens = TOKEN_RE.findall(multi_match['query'].lower())
+            scored = (
+                (_score(movie, tokens=tokens, fields=multi_match['fields']),
+                 movie)
+                for movie in self.movies
+            )
+            return [(score, movie) for score, movie in scored if score > 0]
+        return [(1.0, movie) for movie in self.movies]
+
+    def search(self, body: Dict) -> Dict:
+        """Run search request.
+
+        Args:
+            body: Elasticsearch query body
+
+        Returns:
+            Dict
+        """
+        matched = self._match(body.get('query', {'match_all': {}}))
+        matched.sort(key=lambda pair: -pair[0])
+        for sort in reversed(body.get('sort', [])):
+            (field, order), = sort.items()
+            present = [
+                pair for pair in matched if pair[1].get(field) is not None
+            ]
+            missing = [
+                pair for pair in matched if pair[1].get(field) is None
+            ]
+            present.sort(
+                key=lambda pair: pair[1][field],
+                reverse=order == 'desc',
+            )
+            matched = present + missing
+        start = int(body.get('from', 0))
+        size = int(body.get('size', 10))
+        return {
+            'hits': {
+                'total': {'value': len(matched), 'relation': 'eq'},
+                'hits': [
+                    {'_id': movie['id'], '_score': score, '_source': movie}
+                    for score, movie in matched[start:start + size]
+                ],
+            },
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    catalog: Catalog
+
+    def log_message(self, format, *args):  # noqa: WPS125
+        """Keep the load test output clean."""
+
+    def _reply(self, status: int, payload: Dict) -> None:
+        content = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_GET(self):  # noqa: N802
+        """Handle search, alias and stats requests."""
+        if '/_stats' in self.path:
+            self._reply(200, self.catalog.stats())
+            return
+        if self.path.rstrip('/').endswith('/_alias'):
+            self._reply(200, {'movies': {'aliases': {}}})
+            return
+        if not self.path.rstrip('/').endswith('/_search'):
+            self._reply(404, {'error': 'unsupported', 'status': 404})
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        body = json.loads(self.rfile.read(length) or b'{}')
+        self._reply(200, self.catalog.search(body))
+
+    do_POST = do_GET  # noqa: N815
+
+    def do_HEAD(self):  # noqa: N802
+        """Answer connection checks."""
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+
+class FakeElasticsearch(object):
+    """HTTP server serving catalog on a local port."""
+
+    def __init__(
+        self,
+        catalog: Catalog,
+        *,
+        host: str = '127.0.0.1',
+        port: int = 0,
+    ):
+        handler = type('Handler', (_Handler,), {'catalog': catalog})
+        self.server = ThreadingHTTPServer((host, port), handler)
+        self.server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self.server.serve_forever,
+            daemon=True,
+        )
+
+    @property
+    def url(self) -> str:
+        """Return base URL of the server.
+
+        Returns:
+            str
+        """
+        host, port = self.server.server_address[:2]
+        return 'http://{host}:{port}'.format(host=host, port=port)
+
+    def start(self) -> None:
+        """Start serving in background thread."""
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving."""
+        self.server.shutdown()
+        self.server.server_close()
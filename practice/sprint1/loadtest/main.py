@@ -0,0 +1,368 @@
+"""Load test of the movies API.
+
+Starts the web app against an in-process Elasticsearch stand-in,
+replays a mix of requests at fixed concurrency levels and compares
+throughput and tail latency with a saved baseline.
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+import requests
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from fakees import (
+    Catalog,
+    FakeElasticsearch,
+    load_sqlite_catalog,
+    make_synthetic_catalog,
+)
+
+DIRNAME = os.path.dirname(os.path.abspath(__file__))
+ETL_DIR = os.path.join(DIRNAME, '..', 'etl')
+WEB_DIR = os.path.join(DIRNAME, '..', 'web')
+DB_FILE = os.path.join(ETL_DIR, 'db.sqlite')
+BASELINE_FILE = os.path.join(DIRNAME, 'baseline.json')
+INDEX_NAME = 'movies'
+# Seconds before a hung request is counted as failed
+REQUEST_TIMEOUT = 10
+
+# Share of each request kind in the replayed traffic
+REQUEST_MIX = (
+    ('list', 30),
+    ('paginate', 20),
+    ('sort', 15),
+    ('search', 20),
+    ('detail', 15),
+)
+SORT_FIELDS = ('id', 'title', 'imdb_rating')
+SORT_ORDERS = ('asc', 'desc')
+
+
+class Workload(object):
+    """Deterministic generator of request paths."""
+
+    def __init__(self, movies: List[Dict], *, seed: int):
+        self.rnd = random.Random(seed)
+        self.ids = [movie['id'] for movie in movies]
+        self.terms = sorted({
+            word
+            for movie in movies
+            for word in (movie.get('title') or '').split()
+            if len(word) > 3
+        }) or ['star']
+        kinds, weights = zip(*REQUEST_MIX)
+        self.kinds = kinds
+        self.weights = weights
+
+    def paths(self, count: int) -> List[Tuple[str, str]]:
+        """Return list of (kind, path) pairs.
+
+        Args:
+            count: Number of requests
+
+        Returns:
+            List[Tuple[str, str]]
+        """
+        kinds = self.rnd.choices(self.kinds, weights=self.weights, k=count)
+        return [(kind, getattr(self, '_' + kind)()) for kind in kinds]
+
+    def _list(self) -> str:
+        return '/api/movies'
+
+    def _paginate(self) -> str:
+        return '/api/movies?limit=20&page={0}'.format(self.rnd.randint(1, 5))
+
+    def _sort(self) -> str:
+        return '/api/movies?limit=50&page=1&sort={0}&sort_order={1}'.format(
+            self.rnd.choice(SORT_FIELDS),
+            self.rnd.choice(SORT_ORDERS),
+        )
+
+    def _search(self) -> str:
+        return '/api/movies?page=1&search={0}'.format(
+            self.rnd.choice(self.terms),
+        )
+
+    def _detail(self) -> str:
+        return '/api/movies/{0}'.format(self.rnd.choice(self.ids))
+
+
+def percentile(samples: List[float], share: float) -> float:
+    """Return nearest-rank percentile.
+
+    Args:
+        samples: Sorted samples
+        share: Percentile in range 0..1
+
+    Returns:
+        float
+    """
+    index = max(0, math.ceil(share * len(samples)) - 1)
+    return samples[min(index, len(samples) - 1)]
+
+
+def run_level(
+    base_url: str,
+    paths: List[Tuple[str, str]],
+    concurrency: int,
+) -> Dict:
+    """Replay requests with fixed concurrency.
+
+    Args:
+        base_url: Web app URL
+        paths: Requests to replay
+        concurrency: Number of concurrent clients
+
+    Returns:
+        Dict
+    """
+    local = threading.local()
+
+    def fetch(path: str) -> Tuple[float, bool]:
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        started = time.perf_counter()
+        try:
+            response = session.get(base_url + path, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException:
+            return time.perf_counter() - started, False
+        elapsed = time.perf_counter() - started
+        return elapsed, response.status_code < 400
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, [path for _, path in paths]))
+    duration = time.perf_counter() - started
+
+    latencies = sorted(elapsed for elapsed, _ in results)
+    return {
+        'requests': len(results),
+        'errors': sum(1 for _, ok in results if not ok),
+        'rps': round(len(results) / duration, 1),
+        'p50_ms': round(percentile(latencies, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def _compare_level(
+    level: str,
+    current: Dict,
+    previous: Dict,
+    threshold: float,
+) -> List[str]:
+    """Return regressions of one concurrency level.
+
+    Args:
+        level: Concurrency level
+        current: Current results
+        previous: Baseline results
+        threshold: Permitted relative degradation
+
+    Returns:
+        List[str]
+    """
+    regressions = []
+    error_rate = current['errors'] / current['requests']
+    baseline_error_rate = previous['errors'] / previous['requests']
+    if error_rate > baseline_error_rate:
+        regressions.append('c={0}: error rate {1:.2%} > {2:.2%}'.format(
+            level, error_rate, baseline_error_rate,
+        ))
+    if current['rps'] < previous['rps'] * (1 - threshold):
+        regressions.append('c={0}: rps {1} < {2}'.format(
+            level, current['rps'], previous['rps'],
+        ))
+    for metric in ('p95_ms', 'p99_ms'):
+        if current[metric] > previous[metric] * (1 + threshold):
+            regressions.append('c={0}: {1} {2} > {3}'.format(
+                level, metric, current[metric], previous[metric],
+            ))
+    return regressions
+
+
+def compare(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Return list of regressions against baseline.
+
+    Args:
+        report: Current results by concurrency level
+        baseline: Baseline results by concurrency level
+        threshold: Permitted relative degradation
+
+    Returns:
+        List[str]
+    """
+    regressions = []
+    for level, current in report.items():
+        previous = baseline.get(level)
+        if previous:
+            regressions.extend(
+                _compare_level(level, current, previous, threshold),
+            )
+    return regressions
+
+
+def parse_args() -> argparse.Namespace:
+    """Parse command line arguments.
+
+    Returns:
+        argparse.Namespace
+    """
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        '--catalog', choices=('sqlite', 'synthetic'), default='sqlite',
+    )
+    parser.add_argument('--db', default=DB_FILE)
+    parser.add_argument('--movies', type=int, default=5000)
+    parser.add_argument('--concurrency', default='1,8,32')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--baseline', default=BASELINE_FILE)
+    parser.add_argument('--save-baseline', action='store_true')
+    parser.add_argument('--threshold', type=float, default=0.2)
+    return parser.parse_args()
+
+
+class _QuietHandler(WSGIRequestHandler):
+
+    def log_request(self, *args, **kwargs):
+        """Keep the load test output clean."""
+
+
+def start_app(es_url: str):
+    """Start web app in background thread.
+
+    Args:
+        es_url: Elasticsearch URL
+
+    Returns:
+        werkzeug server
+    """
+    sys.path.insert(0, WEB_DIR)
+    from main import create_app  # noqa: WPS433
+
+    app = create_app({'ES_URL': es_url, 'ES_INDEX': INDEX_NAME})
+    server = make_server(
+        '127.0.0.1',
+        0,
+        app,
+        threaded=True,
+        request_handler=_QuietHandler,
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def load_catalog(args: argparse.Namespace) -> List[Dict]:
+    """Load movies the stand-in is seeded with.
+
+    Args:
+        args: Command line arguments
+
+    Returns:
+        List[Dict]
+    """
+    if args.catalog == 'sqlite':
+        return load_sqlite_catalog(etl_dir=ETL_DIR, db_file=args.db)
+    return make_synthetic_catalog(size=args.movies, seed=args.seed)
+
+
+def run_levels(args: argparse.Namespace, movies: List[Dict]) -> Dict:
+    """Start the app and replay the workload at every concurrency level.
+
+    Args:
+        args: Command line arguments
+        movies: Catalog of the Elasticsearch stand-in
+
+    Returns:
+        Dict, results by concurrency level
+    """
+    fake_es = FakeElasticsearch(Catalog(movies))
+    fake_es.start()
+    server = start_app(fake_es.url)
+    base_url = 'http://127.0.0.1:{0}'.format(server.server_port)
+    flight = server.app.extensions['es'].flight
+    workload = Workload(movies, seed=args.seed)
+
+    report = {}
+    try:
+        run_level(base_url, workload.paths(args.warmup), 1)
+        for level in args.concurrency.split(','):
+            paths = workload.paths(args.requests)
+            before = flight.stats()
+            report[level] = run_level(base_url, paths, int(level))
+            after = flight.stats()
+            for counter in ('executed', 'coalesced'):
+                report[level][counter] = after[counter] - before[counter]
+            print('c={0:>4} {1}'.format(level, report[level]))
+    finally:
+        server.shutdown()
+        fake_es.stop()
+    return report
+
+
+def check_errors(report: Dict) -> bool:
+    """Print failed requests of every level.
+
+    Args:
+        report: Results by concurrency level
+
+    Returns:
+        bool, whether any request failed
+    """
+    failed = [level for level, result in report.items() if result['errors']]
+    for level in failed:
+        print('ERRORS c={0}: {1} of {2} requests failed'.format(
+            level, report[level]['errors'], report[level]['requests'],
+        ))
+    return bool(failed)
+
+
+def check_baseline(args: argparse.Namespace, report: Dict) -> bool:
+    """Save report as the baseline or compare it with the saved one.
+
+    Args:
+        args: Command line arguments
+        report: Results by concurrency level
+
+    Returns:
+        bool, whether there are regressions
+    """
+    if args.save_baseline:
+        with open(args.baseline, 'w') as fcm:
+            json.dump(report, fcm, indent=2, sort_keys=True)
+        print('Baseline saved to {0}'.format(args.baseline))
+        return False
+
+    if not os.path.exists(args.baseline):
+        print('No baseline at {0}, skipping comparison'.format(args.baseline))
+        return False
+    with open(args.baseline, 'r') as fcm:
+        baseline = json.load(fcm)
+    regressions = compare(report, baseline, args.threshold)
+    for regression in regressions:
+        print('REGRESSION', regression)
+    return bool(regressions)
+
+
+def main():
+    """Run load test."""
+    args = parse_args()
+    report = run_levels(args, load_catalog(args))
+    if check_errors(report) or check_baseline(args, report):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
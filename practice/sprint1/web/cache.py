@@ -0,0 +1,54 @@
+"""Response cache."""
+
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+
+class ResponseCache(object):
+    """LRU cache of rendered response bodies.
+
+    Keys include the index version, so entries of an outdated index
+    are never served and are evicted as new ones come in.
+    """
+
+    def __init__(self, *, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached body.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            bytes or None on miss
+        """
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return body
+
+    def set(self, key: str, body: bytes) -> None:
+        """Store body.
+
+        Args:
+            key: Cache key
+            body: Rendered response body
+        """
+        with self._lock:
+            self._entries[key] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
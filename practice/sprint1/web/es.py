@@ -1,16 +1,194 @@
 """Elasticsearch adapter."""
 
+import hashlib
 import json
-from typing import Any, Dict, Iterable
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
 
 import requests
+from requests.adapters import HTTPAdapter
+
+
+class SingleFlight(object):
+    """Coalesce concurrent identical calls into one.
+
+    The first caller for a key becomes the leader and runs the call,
+    callers arriving while it is in flight wait for the leader's result
+    instead of running their own.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key: str, fn, *args, **kwargs) -> Any:
+        """Run fn once for all concurrent callers sharing the key.
+
+        Args:
+            key: Normalized call identity
+            fn: Callable to run
+            args: Positional arguments for fn
+            kwargs: Keyword arguments for fn
+
+        Returns:
+            Any
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            if future is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                future = Future()
+                self._calls[key] = future
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            return future.result()
+
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as exc:
+            future.set_exception(exc)
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+        return future.result()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counters of executed and coalesced calls.
+
+        Returns:
+            Dict
+        """
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls),
+            }
 
 
 class Elasticsearch(object):
 
-    def __init__(self, *, url: str, index: str) -> None:
+    def __init__(
+        self,
+        *,
+        url: str,
+        index: str,
+        version_ttl: float = 1.0,
+        pool_size: int = 10,
+    ) -> None:
         self.url = url
         self.index = index
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        self.session.mount(
+            url,
+            HTTPAdapter(pool_connections=1, pool_maxsize=pool_size),
+        )
+        self.flight = SingleFlight()
+        self.version_ttl = version_ttl
+        self._version = None
+        self._version_expires = 0.0
+        self._version_flight = SingleFlight()
+
+    def _fetch_index_version(self) -> Optional[str]:
+        url = '{url}/{index}/_stats/docs,indexing'.format(
+            url=self.url,
+            index=self.index,
+        )
+        try:
+            indices = self.session.get(url).json().get('indices')
+        except (requests.RequestException, ValueError):
+            return None
+        if not indices:
+            return None
+        state = []
+        for name, stats in sorted(indices.items()):
+            primaries = stats.get('primaries', {})
+            docs = primaries.get('docs', {})
+            indexing = primaries.get('indexing', {})
+            state.append([
+                name,
+                stats.get('uuid'),
+                docs.get('count'),
+                docs.get('deleted'),
+                indexing.get('index_total'),
+                indexing.get('delete_total'),
+            ])
+        return hashlib.sha1(json.dumps(state).encode()).hexdigest()[:16]
+
+    def warm_connections(self) -> int:
+        """Open pooled connections ahead of traffic.
+
+        Returns:
+            int, number of connections that answered
+        """
+        def ping(_) -> bool:
+            try:
+                return self.session.head(self.url).ok
+            except requests.RequestException:
+                return False
+
+        with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+            return sum(pool.map(ping, range(self.pool_size)))
+
+    def describe_index(self) -> Dict[str, Any]:
+        """Check that the index exists and whether it is an alias.
+
+        Returns:
+            Dict
+        """
+        url = '{url}/{index}/_alias'.format(url=self.url, index=self.index)
+        try:
+            response = self.session.get(url)
+        except requests.RequestException:
+            return {'exists': False, 'alias': False, 'indices': []}
+        indices: List[str] = sorted(response.json()) if response.ok else []
+        return {
+            'exists': bool(indices),
+            'alias': bool(indices) and indices != [self.index],
+            'indices': indices,
+        }
+
+    def index_version(self) -> Optional[str]:
+        """Get version of the index contents.
+
+        Derived from document and indexing counters of the index, so it
+        changes on writes and on the refresh that makes them visible.
+        The value is cached for version_ttl seconds, concurrent requests
+        share a single refresh.
+
+        Returns:
+            str or None if Elasticsearch didn't report stats
+        """
+        if time.monotonic() >= self._version_expires:
+            self._version_flight.do('version', self._refresh_index_version)
+        return self._version
+
+    def _refresh_index_version(self) -> None:
+        if time.monotonic() < self._version_expires:
+            return
+        self._version = self._fetch_index_version()
+        self._version_expires = time.monotonic() + self.version_ttl
+
+    def _search(self, *, query: Dict) -> Dict:
+        """Search with in-flight deduplication of identical queries.
+
+        Args:
+            query: Elasticsearch query body
+
+        Returns:
+            Dict
+        """
+        key = json.dumps(query, sort_keys=True)
+        return self.flight.do(key, self._make_request, query=query)
 
     def _make_request(self, *, query: Dict) -> Dict:
         url = '{url}/{index}/_search'.format(
@@ -18,7 +196,7 @@ class Elasticsearch(object):
             index=self.index,
         )
         headers = {'Content-Type': 'application/x-ndjson'}
-        response = requests.get(
+        response = self.session.get(
             url,
             data=json.dumps(query),
             headers=headers,
@@ -41,7 +219,7 @@ class Elasticsearch(object):
                 },
             },
         }
-        response = self._make_request(query=query)
+        response = self._search(query=query)
         source = response['hits']['hits']
         if source:
             detail = source[0]['_source']
@@ -68,8 +246,7 @@ class Elasticsearch(object):
     ) -> Iterable[Any]:
         query = {}
         if limit:
-            query.update({'size': limit})
-            from pprint import pprint; pprint(query)
+            query.update({'size': int(limit)})
         if page:
             query.update({'from': (int(page) - 1)})
         if sort and sort_order:
@@ -111,7 +288,7 @@ class Elasticsearch(object):
                     },
                 },
             )
-        response = self._make_request(query=query)
+        response = self._search(query=query)
         source = response['hits']['hits']
         ls = []
         if source:
@@ -3,16 +3,152 @@
 Практическое задание: сервис на Flask
 """
 
-from flask import Flask, request
+import threading
+import time
+from typing import Any, Dict, Optional
 
+from flask import Blueprint, Flask, current_app, g, request
+
+from cache import ResponseCache
 from es import Elasticsearch
 from schemas import MovieSchema
+from transport import (
+    GZIP,
+    IDENTITY,
+    compress_response,
+    make_etag,
+    negotiate_encoding,
+)
+
+DEFAULT_CONFIG = {
+    'ES_URL': 'http://0.0.0.0:9200',
+    'ES_INDEX': 'movies',
+    'ES_POOL_SIZE': 10,
+    'COMPRESS_LEVEL': 6,
+    'COMPRESS_MIN_SIZE': 500,
+    'RESPONSE_CACHE_SIZE': 1024,
+    'WARMUP': True,
+    # Share of WARMUP_QUERIES which must succeed for the worker to be ready
+    'WARMUP_MIN_COVERAGE': 1.0,
+    # Seconds between warmup retries while the worker is not ready
+    'WARMUP_RETRY_INTERVAL': 5.0,
+    # Default page, top genres and top-rated movies
+    'WARMUP_QUERIES': [
+        '/api/movies',
+        '/api/movies?page=1&search=Action',
+        '/api/movies?page=1&search=Adventure',
+        '/api/movies?page=1&search=Drama',
+        '/api/movies?limit=50&page=1&sort=imdb_rating&sort_order=desc',
+    ],
+}
+
+bp = Blueprint('movies', __name__)
+
+
+def get_es() -> Elasticsearch:
+    """Return Elasticsearch adapter of the current app.
+
+    Returns:
+        Elasticsearch
+    """
+    return current_app.extensions['es']
 
-app = Flask(__name__)
-es = Elasticsearch(url='http://0.0.0.0:9200', index='movies')
 
+def get_cache() -> ResponseCache:
+    """Return response cache of the current app.
 
-@app.route('/client/info')
+    Returns:
+        ResponseCache
+    """
+    return current_app.extensions['response_cache']
+
+
+@bp.before_app_request
+def revalidate():
+    """Answer conditional and cached requests for movie pages.
+
+    Unchanged pages get 304, cached pages are served without a search.
+
+    Returns:
+        Response or None to continue with the view
+    """
+    g.encoding = negotiate_encoding(request)
+    g.etag = None
+    g.cache_key = None
+    if request.method != 'GET' or not request.path.startswith('/api/movies'):
+        return None
+    version = get_es().index_version()
+    if version is None:
+        return None
+    args = list(request.args.items(multi=True))
+    g.etag = make_etag(
+        version=version,
+        path=request.path,
+        args=args,
+        encoding=g.encoding,
+    )
+    if request.if_none_match.contains_weak(g.etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(g.etag)
+        response.vary.add('Accept-Encoding')
+        return response
+    cache_key = make_etag(
+        version=version,
+        path=request.path,
+        args=args,
+        encoding=IDENTITY,
+    )
+    body = get_cache().get(cache_key)
+    if body is not None:
+        return current_app.response_class(body)
+    g.cache_key = cache_key
+    return None
+
+
+@bp.after_app_request
+def encode(response):
+    """Cache, attach validators and compress successful responses.
+
+    Args:
+        response: Outgoing response
+
+    Returns:
+        Response
+    """
+    if response.status_code != 200:
+        return response
+    if g.get('cache_key'):
+        get_cache().set(g.cache_key, response.get_data())
+    response.vary.add('Accept-Encoding')
+    if g.get('etag'):
+        response.set_etag(g.etag)
+    if g.get('encoding') == GZIP:
+        compress_response(
+            response,
+            level=current_app.config['COMPRESS_LEVEL'],
+            min_size=current_app.config['COMPRESS_MIN_SIZE'],
+        )
+    return response
+
+
+@bp.route('/health/ready')
+def ready():
+    """Return warmup report and search counters of the worker.
+
+    Responds with 503 until warmup has succeeded, a failed warmup is
+    retried on the next check after WARMUP_RETRY_INTERVAL.
+
+    Returns:
+        dict, status
+    """
+    report = current_app.extensions['warmup']
+    if not report['ready']:
+        report = retry_warmup(current_app._get_current_object())
+    status = 200 if report['ready'] else 503
+    return dict(report, searches=get_es().flight.stats()), status
+
+
+@bp.route('/client/info')
 def hello_world():
     """Return user agent info.
 
@@ -24,7 +160,7 @@ def hello_world():
     }
 
 
-@app.route('/api/movies')
+@bp.route('/api/movies')
 def movie_list():
     if len(request.args) > 0:
         # Check if limit is integer
@@ -59,7 +195,7 @@ def movie_list():
         if sort and sort not in {'asc', 'desc'}:
             return 'ERROR: Sort order is not permitted', 422
 
-    movies = es.get_list(
+    movies = get_es().get_list(
         limit=request.args.get('limit', 50),
         page=request.args.get('page'),
         sort=request.args.get('sort'),
@@ -70,16 +206,116 @@ def movie_list():
     return schema.dumps(movies, many=True)
 
 
-@app.route('/api/movies/')
+@bp.route('/api/movies/')
 def movie_detail_empty():
     return ''
 
 
-@app.route('/api/movies/<string:movie_id>')
+@bp.route('/api/movies/<string:movie_id>')
 def movie_detail(movie_id):
-    movie = es.get_detail(movie_id=movie_id)
+    movie = get_es().get_detail(movie_id=movie_id)
     schema = MovieSchema()
     response = schema.dumps(movie)
     if movie:
         return response
     return '', 404
+
+
+def warmup(app: Flask) -> Dict[str, Any]:
+    """Pre-warm connections and prime the response cache.
+
+    Args:
+        app: Application to warm up
+
+    Returns:
+        Dict
+    """
+    es = app.extensions['es']
+    report = {
+        'connections': es.warm_connections(),
+        'index': es.describe_index(),
+        'queries': len(app.config['WARMUP_QUERIES']),
+        'warmed': 0,
+    }
+    if report['index']['exists']:
+        client = app.test_client()
+        for path in app.config['WARMUP_QUERIES']:
+            if client.get(path).status_code == 200:
+                report['warmed'] += 1
+    report['coverage'] = round(
+        report['warmed'] / report['queries'] if report['queries'] else 1, 2,
+    )
+    report['cached'] = len(app.extensions['response_cache'])
+    report['ready'] = (
+        report['connections'] > 0
+        and report['index']['exists']
+        and report['coverage'] >= app.config['WARMUP_MIN_COVERAGE']
+    )
+    return report
+
+
+def retry_warmup(app: Flask) -> Dict[str, Any]:
+    """Run warmup again unless it was attempted recently.
+
+    Only one thread retries at a time, others get the last report.
+
+    Args:
+        app: Application to warm up
+
+    Returns:
+        Dict
+    """
+    lock = app.extensions['warmup_lock']
+    if not lock.acquire(blocking=False):
+        return app.extensions['warmup']
+    try:
+        elapsed = time.monotonic() - app.extensions['warmup_at']
+        if elapsed >= app.config['WARMUP_RETRY_INTERVAL']:
+            previous = app.extensions['warmup']
+            report = warmup(app)
+            report['startup_ms'] = previous['startup_ms']
+            report['attempts'] = previous['attempts'] + 1
+            app.extensions['warmup'] = report
+            app.extensions['warmup_at'] = time.monotonic()
+            print('Warmup retried: {0}'.format(report))
+    finally:
+        lock.release()
+    return app.extensions['warmup']
+
+
+def create_app(config: Optional[Dict[str, Any]] = None) -> Flask:
+    """Build the application and warm it up.
+
+    Settings come from DEFAULT_CONFIG, then the file named by the
+    MOVIES_SETTINGS environment variable, then the config argument.
+
+    Args:
+        config: Settings overrides
+
+    Returns:
+        Flask
+    """
+    started = time.monotonic()
+    app = Flask(__name__)
+    app.config.update(DEFAULT_CONFIG)
+    app.config.from_envvar('MOVIES_SETTINGS', silent=True)
+    app.config.update(config or {})
+
+    app.extensions['es'] = Elasticsearch(
+        url=app.config['ES_URL'],
+        index=app.config['ES_INDEX'],
+        pool_size=app.config['ES_POOL_SIZE'],
+    )
+    app.extensions['response_cache'] = ResponseCache(
+        max_entries=app.config['RESPONSE_CACHE_SIZE'],
+    )
+    app.register_blueprint(bp)
+
+    report = warmup(app) if app.config['WARMUP'] else {'ready': True}
+    report['startup_ms'] = round((time.monotonic() - started) * 1000, 1)
+    report['attempts'] = 1
+    app.extensions['warmup'] = report
+    app.extensions['warmup_at'] = time.monotonic()
+    app.extensions['warmup_lock'] = threading.Lock()
+    print('Warmup finished: {0}'.format(report))
+    return app
@@ -0,0 +1,120 @@
+"""Tests of the Elasticsearch adapter."""
+
+import threading
+import time
+
+import pytest
+
+from es import Elasticsearch, SingleFlight
+
+CALLERS = 8
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, 'condition not met in time'
+        time.sleep(0.001)
+
+
+def _run_concurrently(flight: SingleFlight, target, release) -> list:
+    outcomes = []
+
+    def call():
+        try:
+            outcomes.append(target())
+        except Exception as exc:  # noqa: B902
+            outcomes.append(exc)
+
+    threads = [threading.Thread(target=call) for _ in range(CALLERS)]
+    for thread in threads:
+        thread.start()
+    _wait_for(lambda: flight.stats()['coalesced'] == CALLERS - 1)
+    release.set()
+    for thread in threads:
+        thread.join()
+    return outcomes
+
+
+def test_concurrent_identical_searches_share_one_request(monkeypatch):
+    es = Elasticsearch(url='http://es', index='movies')
+    release = threading.Event()
+    requests_made = []
+
+    def make_request(*, query):
+        requests_made.append(query)
+        release.wait()
+        return {'hits': {'hits': [{'_source': {'id': 'tt1'}}]}}
+
+    monkeypatch.setattr(es, '_make_request', make_request)
+    outcomes = _run_concurrently(
+        es.flight,
+        lambda: es.get_list(
+            limit='50', page=None, sort=None, sort_order=None, search='',
+        ),
+        release,
+    )
+
+    assert len(requests_made) == 1
+    assert outcomes == [[{'id': 'tt1'}]] * CALLERS
+    assert es.flight.stats() == {
+        'executed': 1,
+        'coalesced': CALLERS - 1,
+        'in_flight': 0,
+    }
+
+
+def test_leader_exception_is_raised_to_followers():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def fail():
+        release.wait()
+        raise ValueError('boom')
+
+    outcomes = _run_concurrently(
+        flight,
+        lambda: flight.do('key', fail),
+        release,
+    )
+
+    assert len(outcomes) == CALLERS
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
+    assert flight.stats()['in_flight'] == 0
+
+
+def test_calls_after_completion_are_not_coalesced():
+    flight = SingleFlight()
+
+    assert flight.do('key', lambda: 1) == 1
+    assert flight.do('key', lambda: 2) == 2
+    assert flight.stats()['executed'] == 2
+    assert flight.stats()['coalesced'] == 0
+
+
+def test_failed_call_is_not_remembered():
+    flight = SingleFlight()
+
+    with pytest.raises(KeyError):
+        flight.do('key', {}.__getitem__, 'missing')
+    assert flight.do('key', lambda: 'ok') == 'ok'
+    assert flight.stats()['executed'] == 2
+
+
+def test_concurrent_version_checks_share_one_stats_request(monkeypatch):
+    es = Elasticsearch(url='http://es', index='movies')
+    release = threading.Event()
+    fetches = []
+
+    def fetch_index_version():
+        fetches.append(1)
+        release.wait()
+        return 'v1'
+
+    monkeypatch.setattr(es, '_fetch_index_version', fetch_index_version)
+    outcomes = _run_concurrently(es._version_flight, es.index_version, release)
+
+    assert outcomes == ['v1'] * CALLERS
+    assert len(fetches) == 1
+    assert es.index_version() == 'v1'
+    assert len(fetches) == 1
@@ -0,0 +1,80 @@
+"""Tests of the application factory."""
+
+import os
+import socket
+import sys
+
+from main import create_app
+
+sys.path.insert(
+    0, os.path.join(os.path.dirname(__file__), '..', 'loadtest'),
+)
+from fakees import (  # noqa: E402, I001
+    Catalog,
+    FakeElasticsearch,
+    make_synthetic_catalog,
+)
+
+UNREACHABLE_ES = 'http://127.0.0.1:1'
+
+
+def test_worker_is_not_ready_when_warmup_failed():
+    app = create_app({'ES_URL': UNREACHABLE_ES})
+
+    response = app.test_client().get('/health/ready')
+
+    assert response.status_code == 503
+    assert response.json['connections'] == 0
+    assert response.json['index']['exists'] is False
+    assert response.json['ready'] is False
+
+
+def test_worker_is_ready_without_warmup():
+    app = create_app({'ES_URL': UNREACHABLE_ES, 'WARMUP': False})
+
+    response = app.test_client().get('/health/ready')
+
+    assert response.status_code == 200
+    assert response.json['ready'] is True
+    assert response.json['searches']['executed'] == 0
+
+
+def test_worker_becomes_ready_when_es_comes_up():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        port = probe.getsockname()[1]
+    app = create_app({
+        'ES_URL': 'http://127.0.0.1:{0}'.format(port),
+        'WARMUP_RETRY_INTERVAL': 0,
+    })
+    client = app.test_client()
+    assert client.get('/health/ready').status_code == 503
+
+    fake_es = FakeElasticsearch(
+        Catalog(make_synthetic_catalog(size=50)),
+        port=port,
+    )
+    fake_es.start()
+    try:
+        response = client.get('/health/ready')
+    finally:
+        fake_es.stop()
+
+    assert response.status_code == 200
+    assert response.json['ready'] is True
+    assert response.json['attempts'] == 3
+    assert response.json['coverage'] == 1.0
+
+
+def test_warmup_retries_are_rate_limited():
+    app = create_app({
+        'ES_URL': UNREACHABLE_ES,
+        'WARMUP_RETRY_INTERVAL': 60,
+    })
+    client = app.test_client()
+
+    client.get('/health/ready')
+    response = client.get('/health/ready')
+
+    assert response.status_code == 503
+    assert response.json['attempts'] == 1
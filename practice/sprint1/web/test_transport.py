@@ -0,0 +1,62 @@
+"""Tests of the HTTP transport helpers."""
+
+import gzip
+import time
+
+from flask import Response
+
+from transport import compress_response, make_etag
+
+
+def _etag(args) -> str:
+    return make_etag(
+        version='v1',
+        path='/api/movies',
+        args=args,
+        encoding='gzip',
+    )
+
+
+def test_etag_ignores_argument_order():
+    first = _etag([('page', '1'), ('search', 'star')])
+    second = _etag([('search', 'star'), ('page', '1')])
+
+    assert first == second
+
+
+def test_etag_keeps_order_of_repeated_argument_values():
+    first = _etag([('search', 'star'), ('search', 'night')])
+    second = _etag([('search', 'night'), ('search', 'star')])
+
+    assert first != second
+
+
+def test_etag_depends_on_version_and_encoding():
+    args = [('page', '1')]
+    etag = _etag(args)
+
+    assert etag != make_etag(
+        version='v2', path='/api/movies', args=args, encoding='gzip',
+    )
+    assert etag != make_etag(
+        version='v1', path='/api/movies', args=args, encoding='identity',
+    )
+
+
+def _gzipped_body(etag: str) -> bytes:
+    response = Response('movies ' * 200)
+    response.set_etag(etag)
+    compress_response(response, level=6, min_size=0)
+    return response.get_data()
+
+
+def test_gzip_body_is_identical_for_the_same_etag():
+    etag = _etag([('page', '1')])
+
+    first = _gzipped_body(etag)
+    # The gzip header stores mtime with one second resolution
+    time.sleep(1.1)
+    second = _gzipped_body(etag)
+
+    assert first == second
+    assert gzip.decompress(first) == b'movies ' * 200
@@ -0,0 +1,80 @@
+"""HTTP transport helpers: response compression and validators."""
+
+import gzip
+import hashlib
+from typing import Iterable, Tuple
+
+from flask import Request, Response
+
+GZIP = 'gzip'
+IDENTITY = 'identity'
+
+
+def negotiate_encoding(request: Request) -> str:
+    """Choose response content coding.
+
+    Args:
+        request: Incoming request
+
+    Returns:
+        str
+    """
+    if request.accept_encodings[GZIP]:
+        return GZIP
+    return IDENTITY
+
+
+def make_etag(
+    *,
+    version: str,
+    path: str,
+    args: Iterable[Tuple[str, str]],
+    encoding: str,
+) -> str:
+    """Build strong entity tag for the query against the index version.
+
+    The content coding is part of the tag because a strong validator
+    must differ between representations. Arguments are ordered by name
+    only, values of a repeated argument keep their order.
+
+    Args:
+        version: Index version
+        path: Request path
+        args: Query string arguments
+        encoding: Negotiated content coding
+
+    Returns:
+        str
+    """
+    identity = '\n'.join([version, path, encoding] + [
+        '{0}={1}'.format(name, argument_value)
+        for name, argument_value in sorted(args, key=lambda pair: pair[0])
+    ])
+    return hashlib.sha1(identity.encode()).hexdigest()
+
+
+def compress_response(
+    response: Response,
+    *,
+    level: int,
+    min_size: int,
+) -> Response:
+    """Compress response body with gzip in place.
+
+    Args:
+        response: Outgoing response
+        level: Compression level
+        min_size: Smaller bodies are left as is
+
+    Returns:
+        Response
+    """
+    if response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    body = response.get_data()
+    if len(body) < min_size:
+        return response
+    # A fixed mtime keeps the bytes equal for equal strong ETags
+    response.set_data(gzip.compress(body, compresslevel=level, mtime=0))
+    response.headers['Content-Encoding'] = GZIP
+    return response